@@ -1,16 +1,19 @@
 #!/usr/bin/env python3
 
-from configparser import RawConfigParser
-from lib.sonar_client import SonarClient
+from concurrent.futures import ThreadPoolExecutor
 
-import github
-import json
+import functools
 import os
 import re
-import requests
 import signal
 import sys
 
+# Prefer orjson for faster parsing, fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    import json as orjson
+
 
 ###
 # GLOBALS
@@ -20,7 +23,10 @@ SONAR_LOGO            = '![image](https://github.com/mx51/sonar-results-action/r
 PASSED_IMAGE          = '![image](https://github.com/mx51/sonar-results-action/raw/master/images/passed.png) '
 FAILED_IMAGE          = '![image](https://github.com/mx51/sonar-results-action/raw/master/images/failed.png) '
 SONAR_PROPERTIES      = 'sonar-project.properties'
+GITHUB_API_URL        = 'https://api.github.com'
 SONAR_DEFAULT_KEYS    = ['new_coverage', 'new_lines', 'new_code_smells', 'new_bugs']
+SONAR_QUALITY_GATE    = 'alert_status'
+RESULT_HASH_PATTERN   = re.compile(r'<!-- sonar_results: .* -->')
 
 
 ###
@@ -36,20 +42,39 @@ def main():
         print(' * Not a pull request.')
         sys.exit()
 
-    # Fetch sonar details
-    sonar_project_key, results, quality_gate_status = fetch_sonar_results(pr_number)
-
     # Get github params
     token = get_env_var('GITHUB_TOKEN')
     repo_name = get_env_var('GITHUB_REPOSITORY')
+    api_url = get_env_var('GITHUB_API_URL', strict=False) or GITHUB_API_URL
+
+    # Import api clients only once we know this is a pull request
+    from lib.github_client import GithubClient
+
+    # Create github client
+    github_client = GithubClient(api_url, token)
+
+    try:
+        # Fetch sonar details concurrently with the existing PR comment
+        with ThreadPoolExecutor() as executor:
+            sonar_future = executor.submit(fetch_sonar_results, pr_number)
+            comment_future = executor.submit(find_sonar_comment, github_client, repo_name, pr_number)
+
+            sonar_project_key, results, quality_gate_status = sonar_future.result()
+            issue_comment = comment_future.result()
+
+        # Check if result hashes match
+        pr_result_hash = extract_result_hash(issue_comment)
+        result_hash = generate_result_hash(results)
 
-    # Fetch PR details
-    gh = github.Github(token)
-    repo = gh.get_repo(repo_name)
-    pr = repo.get_pull(pr_number)
+        if pr_result_hash == result_hash:
+            # Do not recreate duplicate comment
+            print(' * Sonar scan results comment already exists. No update.')
+        else:
+            # Update PR with comment
+            update_pr_comment(github_client, repo_name, pr_number, issue_comment, sonar_project_key, result_hash, results, quality_gate_status)
 
-    # Update PR with comment
-    update_pr_comment(pr, sonar_project_key, results, quality_gate_status)
+    finally:
+        github_client.close()
 
     # Exit based on status
     if quality_gate_status:
@@ -59,38 +84,29 @@ def main():
         sys.exit(1)
 
 
-# Update PR with sonar scan comment
-def update_pr_comment(pr, sonar_project_key, results, quality_gate_status):
+# Find most recent sonar scan comment on the PR
+def find_sonar_comment(github_client, repo_name, pr_number):
     # Retrieve most recent sonar scan comment to avoid duplicates
-    issue_comment = None
-
-    for c in pr.get_issue_comments().reversed:
-        if SONAR_LOGO in c.body:
-            issue_comment = c
-            break
+    for c in github_client.get_issue_comments_reversed(repo_name, pr_number):
+        if c['body'].startswith(SONAR_LOGO):
+            return c
 
-    # Check comment for result hash
-    pr_result_hash = extract_result_hash(issue_comment)
+    return None
 
-    # Check if result hashes match
-    result_hash = generate_result_hash(results)
-
-    if pr_result_hash == result_hash:
-        # Do not recreate duplicate comment
-        print(' * Sonar scan results comment already exists. No update.')
-        return
 
+# Update PR with sonar scan comment
+def update_pr_comment(github_client, repo_name, pr_number, issue_comment, sonar_project_key, result_hash, results, quality_gate_status):
     # Note: new comments will be added each time scan results change
     print(' * Creating PR comment with latest sonar scan results')
 
     # Create comment body
-    comment_body = generate_comment_body(sonar_project_key, result_hash, results, quality_gate_status, pr.number)
+    comment_body = generate_comment_body(sonar_project_key, result_hash, results, quality_gate_status, pr_number)
 
     # Create or update pull request comment
     if issue_comment:
-        issue_comment.edit(comment_body)
+        github_client.edit_issue_comment(repo_name, issue_comment['id'], comment_body)
     else:
-        pr.create_issue_comment(comment_body)
+        github_client.create_issue_comment(repo_name, pr_number, comment_body)
 
 
 # Create PR comment body
@@ -100,13 +116,16 @@ def generate_comment_body(sonar_project_key, result_hash, results, quality_gate_
 
     # Begin comment
     project_link = generate_project_link("dashboard", sonar_project_key, pr_number)
-    comment = f'{SONAR_LOGO}  **[Scan Results]({project_link})**:\n\n'
+    parts = [f'{SONAR_LOGO}  **[Scan Results]({project_link})**:\n\n']
 
     # Add pass/fail image
-    comment += f'[{status_image}]({project_link})\n\n'
+    parts.append(f'[{status_image}]({project_link})\n\n')
 
     # Start table header
-    comment += '| Metric | This PR |\n|-------|--------------|\n'
+    parts.append('| Metric | This PR |\n|-------|--------------|\n')
+
+    # Metric links share the same base url
+    base_url = generate_project_link("component_measures", sonar_project_key, pr_number)
 
     for metric in results:
         key = metric['metric']
@@ -121,13 +140,13 @@ def generate_comment_body(sonar_project_key, result_hash, results, quality_gate_
             new_value = format_percentage(new_value)
 
         # Create line item
-        comment += result_line_item(sonar_project_key, key, new_value, pr_number)
+        parts.append(result_line_item(base_url, key, new_value))
 
     # Append result hash
-    comment += result_hash
+    parts.append(result_hash)
 
     # Return comment
-    return comment.rstrip()
+    return ''.join(parts).rstrip()
 
 
 # Format to one decimal place
@@ -140,16 +159,12 @@ def format_percentage(value):
 
 
 # Create a line item for Github comment table
-def result_line_item(sonar_project_key, key_name, new_value, pr_number):
+def result_line_item(base_url, key_name, new_value):
     # Use 'new_*' key for metric link if result available
     metric_ref = key_name if new_value == '-' else f'new_{key_name}'
 
-    # Generate key_name link
-    base_url = generate_project_link("component_measures", sonar_project_key, pr_number)
-    key_url = f'{base_url}&metric={metric_ref}'
-
-    # Generate line item
-    return f'| [{key_name}]({key_url}) | {new_value} |\n'
+    # Generate line item, with key_name linked to its metric page
+    return f'| [{key_name}]({base_url}&metric={metric_ref}) | {new_value} |\n'
 
 
 # Create result string as hidden text
@@ -177,13 +192,18 @@ def extract_result_hash(issue_comment):
         return '(not found)'
 
     # Get comment body
-    comment_body = issue_comment.body
+    comment_body = issue_comment['body']
+
+    # Check for HTML comment string, which is appended at the end of the comment
+    hash_start = comment_body.rfind('<!-- sonar_results: ')
+
+    if hash_start == -1:
+        return '(not found)'
 
-    # Check for HTML comment string
-    comment_search = re.search('(<!-- sonar_results: .* -->)', comment_body)
+    comment_search = RESULT_HASH_PATTERN.match(comment_body, hash_start)
 
     if comment_search:
-        return comment_search.group(1)
+        return comment_search.group(0)
 
     # Comment hash not found
     return '(not found)'
@@ -199,28 +219,29 @@ def fetch_sonar_results(pr_number):
     sonar_token = get_env_var('SONAR_TOKEN')
 
     # Create sonar client
+    from lib.sonar_client import SonarClient
     sonar_client = SonarClient(sonar_url, sonar_token)
 
-    # Get project metric values
-    measures = fetch_project_measures(sonar_client, sonar_project_key, SONAR_DEFAULT_KEYS, pr_number)
+    try:
+        # Get project metric values, including quality gate status
+        measures = fetch_project_measures(sonar_client, sonar_project_key, SONAR_DEFAULT_KEYS + [SONAR_QUALITY_GATE], pr_number)
+
+    finally:
+        sonar_client.close()
 
-    # Note available keys from returned measures
-    available_keys = [m['metric'] for m in measures]
+    # Index returned measures by metric key
+    measure_values = extract_results(measures)
 
     # Parse results
     results = []
     for key in SONAR_DEFAULT_KEYS:
-        new_value = 'No result'
-
-        # Check if this 'key' has a corresponding 'new_key' result
-        if key in available_keys:
-            new_value = extract_result(key, measures)
+        new_value = measure_values.get(key, 'No result')
 
         # Store result as dict
         results.append({'metric': key, 'new_value': new_value})
 
     # Check quality gate status
-    quality_gate_passed = fetch_quality_gate_status(sonar_client, sonar_project_key, pr_number)
+    quality_gate_passed = measure_values.get(SONAR_QUALITY_GATE) == 'OK'
 
     # Log results for action output
     print(f' * Sonar scan results  : {results}')
@@ -230,17 +251,6 @@ def fetch_sonar_results(pr_number):
     return sonar_project_key, results, quality_gate_passed
 
 
-def fetch_quality_gate_status(sonar_client, sonar_project_key, pr_number):
-    # Check quality gate
-    qg_status = sonar_client.get_qualitygate_status(sonar_project_key, pr_number)
-
-    if "projectStatus" in qg_status:
-        if "status" in qg_status["projectStatus"]:
-            return qg_status["projectStatus"]["status"] == "OK"
-
-    return False
-
-
 # Get metrics for project
 def fetch_project_measures(sonar_client, sonar_project_key, measurable_keys, pr_number):
     # Prepare metric key query
@@ -251,18 +261,10 @@ def fetch_project_measures(sonar_client, sonar_project_key, measurable_keys, pr_
     return component['component']['measures']
 
 
-# Extract result values
-def extract_result(key, measures):
-    # Check for result
-    for metric in measures:
-        if metric['metric'] == key:
-            if 'period' in metric:
-                return metric['period']['value']
-            else:
-                return metric['value']
-
-    # No result
-    return 'No result'
+# Extract result values keyed by metric
+def extract_results(measures):
+    # Prefer 'period' value where available
+    return {m['metric']: m['period']['value'] if 'period' in m else m['value'] for m in measures}
 
 
 # Read sonar-project.properties file
@@ -273,12 +275,18 @@ def read_sonar_project_key():
 
     # Read sonar properties
     with(open(sonar_properties, 'r')) as f:
-        for prop in [line.rstrip() for line in f]:
-            name, value = prop.split('=')
+        for line in f:
+            line = line.strip()
+
+            # Skip blank lines, comments and lines without a value
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+
+            name, _, value = line.partition('=')
 
             # Check property
-            if name == 'sonar.projectKey':
-                return value
+            if name.strip() == 'sonar.projectKey':
+                return value.strip()
 
     # Something went wrong
     print(f'error: sonar.projectKey value not found in sonar properties file: {SONAR_PROPERTIES}')
@@ -313,13 +321,14 @@ def read_event():
     event_path = get_env_var('GITHUB_EVENT_PATH')
 
     # Read json contents
-    with open(event_path, 'r') as f:
-        json_data = json.load(f)
+    with open(event_path, 'rb') as f:
+        json_data = orjson.loads(f.read())
 
     return json_data
 
 
-# Look up env var
+# Look up env var (cached, env vars do not change during a run)
+@functools.lru_cache(maxsize=None)
 def get_env_var(env_var_name, strict=True):
     # Check env var
     value = os.getenv(env_var_name)
@@ -0,0 +1,72 @@
+"""
+Client for Github REST API
+"""
+
+import requests
+
+# Prefer orjson for faster parsing, fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    import json as orjson
+
+
+class GithubClient:
+    """
+    GithubClient class
+    """
+
+    def __init__(self, github_api_url, github_token):
+        self.github_api_url = github_api_url
+        self.github_token = github_token
+
+        # Reuse one session so all api calls share a pooled connection
+        self._session = requests.Session()
+        self._session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {github_token}"
+        })
+
+    def get_issue_comments_reversed(self, repo_name, issue_number):
+        # Create request url, using the largest page size so most PRs fit on one page
+        request_url = f"{self.github_api_url}/repos/{repo_name}/issues/{issue_number}/comments?per_page=100"
+
+        # Comments are returned oldest first, so start from the last page
+        response = self.api_call(request_url)
+
+        if "last" in response.links:
+            response = self.api_call(response.links["last"]["url"])
+
+        # Walk back through pages, newest comment first
+        while True:
+            yield from reversed(orjson.loads(response.content))
+
+            if "prev" not in response.links:
+                return
+
+            response = self.api_call(response.links["prev"]["url"])
+
+    def create_issue_comment(self, repo_name, issue_number, body):
+        # Create request url
+        request_url = f"{self.github_api_url}/repos/{repo_name}/issues/{issue_number}/comments"
+
+        # Call api
+        return self.api_call(request_url, method="POST", payload={"body": body})
+
+    def edit_issue_comment(self, repo_name, comment_id, body):
+        # Create request url
+        request_url = f"{self.github_api_url}/repos/{repo_name}/issues/comments/{comment_id}"
+
+        # Call api
+        return self.api_call(request_url, method="PATCH", payload={"body": body})
+
+    def api_call(self, request_url, method="GET", payload=None):
+        # Call api
+        response = self._session.request(method, request_url, json=payload, timeout=10)
+        response.raise_for_status()
+
+        return response
+
+    def close(self):
+        # Release pooled connections
+        self._session.close()
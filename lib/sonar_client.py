@@ -5,6 +5,12 @@ Client for SonarQube Web API
 import requests
 import sys
 
+# Prefer orjson for faster parsing, fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    import json as orjson
+
 
 class SonarClient:
     """
@@ -15,6 +21,13 @@ class SonarClient:
         self.sonar_host_url = sonar_host_url
         self.sonar_token = sonar_token
 
+        # Reuse one session so all api calls share a pooled connection
+        self._session = requests.Session()
+        self._session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {sonar_token}"
+        })
+
     def get_project_measures(self, sonar_project_key, pull_request_number, measurable_keys):
         # Create request url
         request_url = f"api/measures/component?component={sonar_project_key}&pullRequest={pull_request_number}&metricKeys={measurable_keys}"
@@ -22,22 +35,13 @@ class SonarClient:
         # Call api
         return self.api_call(request_url)
 
-    def get_qualitygate_status(self, sonar_project_key, pull_request_number):
-        # Create request url
-        request_url = f"api/qualitygates/project_status?projectKey={sonar_project_key}&pullRequest={pull_request_number}"
-
-        # Call api
-        return self.api_call(request_url)
-
     def api_call(self, request_url):
-        # Set headers
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.sonar_token}"
-        }
-
         # Call api
-        response = requests.get(self.sonar_host_url + request_url, headers=headers)
+        response = self._session.get(self.sonar_host_url + request_url, timeout=10)
 
         # TODO: add handler for response code and errors
-        return response.json()
+        return orjson.loads(response.content)
+
+    def close(self):
+        # Release pooled connections
+        self._session.close()